@@ -0,0 +1,136 @@
+"""
+Measures the parse loop overhead of quarantine support: the parser as it was
+before (plain string lines, rejects dropped) against the current parser with
+line numbers and rejected rows streamed to a quarantine file
+
+Usage: python benchmarks/bench_quarantine.py [rows]
+"""
+
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_processor import parse_transactions
+from utils.quarantine import QuarantineWriter
+
+REJECT_RATE = 0.05
+REPEATS = 21
+
+
+def parse_transactions_baseline(raw_lines):
+    """
+    parse_transactions as it was before quarantine support (plain string
+    lines, rejected rows silently dropped)
+    """
+
+    transactions = []
+
+    for line in raw_lines:
+        parts = line.split("|")
+
+        # Skip rows with incorrect number of fields
+        if len(parts) != 8:
+            continue
+
+        try:
+            transaction_id = parts[0].strip()
+            date = parts[1].strip()
+            product_id = parts[2].strip()
+
+            # Remove commas from ProductName
+            product_name = parts[3].replace(",", "").strip()
+
+            # Remove commas from numeric fields
+            quantity = int(parts[4].replace(",", "").strip())
+            unit_price = float(parts[5].replace(",", "").strip())
+
+            customer_id = parts[6].strip()
+            region = parts[7].strip()
+
+            transactions.append({
+                "TransactionID": transaction_id,
+                "Date": date,
+                "ProductID": product_id,
+                "ProductName": product_name,
+                "Quantity": quantity,
+                "UnitPrice": unit_price,
+                "CustomerID": customer_id,
+                "Region": region
+            })
+
+        except ValueError:
+            # Skip rows with conversion issues
+            continue
+
+    return transactions
+
+
+def make_lines(rows, seed=0):
+    rng = random.Random(seed)
+    lines = []
+
+    for i in range(rows):
+        line = f"T{i}|2024-12-{rng.randint(1, 28):02d}|P{rng.randint(101, 110)}|Mouse|{rng.randint(1, 9)}|1,{rng.randint(100, 999)}|C{rng.randint(1, 50):03d}|North"
+        if rng.random() < REJECT_RATE:
+            line = line.replace("|North", "") if rng.random() < 0.5 else line.replace("|Mouse|", "|Mouse|x")
+        lines.append(line)
+
+    return lines, array("q", range(2, rows + 2))
+
+
+def interleaved_times(*funcs):
+    """
+    Runs the functions interleaved, alternating their order, so drift and
+    position effects hit them equally
+
+    Returns: list of wall-clock times per function, one entry per round
+    """
+
+    timings = [[] for _ in funcs]
+
+    for repeat in range(REPEATS):
+        runs = list(zip(funcs, timings))
+        for func, results in (runs if repeat % 2 else runs[::-1]):
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            results.append(time.perf_counter() - start)
+
+    return timings
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    lines, line_numbers = make_lines(rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rejected.txt")
+
+        def with_quarantine():
+            with QuarantineWriter(path) as quarantine:
+                parse_transactions(lines, quarantine=quarantine, line_numbers=line_numbers)
+
+        baseline, quarantined = interleaved_times(
+            lambda: parse_transactions_baseline(lines), with_quarantine
+        )
+
+    # Compare runs from the same round, which share the machine's state at
+    # that moment, rather than medians taken across the whole run
+    overhead = statistics.median(q / b - 1 for q, b in zip(quarantined, baseline)) * 100
+
+    print(f"Rows           : {rows:,} ({REJECT_RATE:.0%} rejected)")
+    print(f"Median of {REPEATS} runs")
+    print(f"Before         : {statistics.median(baseline):.3f}s")
+    print(f"With quarantine: {statistics.median(quarantined):.3f}s")
+    print(f"Overhead       : {overhead:+.2f}% (median of per-round ratios)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,111 +1,254 @@
-from utils.report_generator import generate_sales_report
-from utils.file_handler import read_sales_data
-from utils.data_processor import (
-    parse_transactions,
-    calculate_total_revenue,
-    region_wise_sales,
-    top_selling_products,
-    customer_analysis,
-    daily_sales_trend,
-    find_peak_sales_day,
-    low_performing_products
+import argparse
+import glob
+
+from utils.pipeline import stage, run_pipeline, Uncached
+
+# Stage imports are done lazily inside each stage so that, for example,
+# `requests` is only loaded when the API stage actually has to run.
+
+# Product data from the API is refreshed at least once a day
+FETCH_TTL = 24 * 60 * 60
+
+# Order value sketches saved by other shards or earlier runs
+# (copies of output/order_value_sketches.json) are merged into the report
+SKETCH_SHARDS = sorted(glob.glob("data/sketches/*.json"))
+
+
+@stage("read", files=["data/sales_data.txt", "utils/file_handler.py"], persist=False)
+def read_stage():
+    from utils.file_handler import read_sales_data
+
+    raw_lines, line_numbers = read_sales_data("data/sales_data.txt", with_line_numbers=True)
+    print(f"Successfully read {len(raw_lines)} transactions\n")
+    return raw_lines, line_numbers
+
+
+@stage(
+    "parse",
+    inputs=["read"],
+    files=["utils/data_processor.py", "utils/quarantine.py"],
+    outputs=["output/rejected_parse.txt"],
+    persist=False
+)
+def parse_stage(read):
+    from utils.data_processor import parse_transactions
+    from utils.quarantine import QuarantineWriter
+
+    raw_lines, line_numbers = read
+    skipped = []
+
+    with QuarantineWriter("output/rejected_parse.txt") as quarantine:
+        parsed_transactions = parse_transactions(
+            raw_lines, quarantine=quarantine, line_numbers=line_numbers, skipped=skipped
+        )
+
+    print(f"Parsed {len(parsed_transactions)} records")
+    print(f"Rejected {quarantine.total} rows -> output/rejected_parse.txt {quarantine.counts}\n")
+    return parsed_transactions, quarantine.counts, skipped
+
+
+@stage(
+    "validate",
+    inputs=["read", "parse"],
+    files=["utils/data_validator.py", "utils/quarantine.py"],
+    outputs=["output/rejected_validate.txt"]
 )
-from utils.data_validator import validate_and_filter
-from utils.api_handler import (
-    fetch_all_products,
-    create_product_mapping,
-    enrich_sales_data,
-    save_enriched_data
+def validate_stage(read, parsed):
+    from utils.data_processor import source_position
+    from utils.data_validator import validate_and_filter
+    from utils.quarantine import QuarantineWriter
+
+    raw_lines, line_numbers = read
+    parsed_transactions, parse_rejects, skipped = parsed
+
+    # Only called for invalid rows, so no per-row copy of the input is made
+    def source_lines(position):
+        index = source_position(position, skipped)
+        return line_numbers[index], raw_lines[index]
+
+    print("Filter Options Available:")
+    print("Regions: North, South, East, West")
+    print("Amount Range: ₹500 - ₹900,000")
+    print("Do you want to filter data? (y/n): n\n")
+
+    with QuarantineWriter("output/rejected_validate.txt") as quarantine:
+        valid_transactions, invalid_count, summary = validate_and_filter(
+            parsed_transactions, quarantine=quarantine, source_lines=source_lines
+        )
+    summary["parse_rejects"] = parse_rejects
+
+    print(f"Valid: {len(valid_transactions)} | Invalid: {invalid_count}")
+    for reason, count in summary["invalid_reasons"].items():
+        print(f"  {reason}: {count}")
+    print("Invalid rows written to output/rejected_validate.txt\n")
+    return valid_transactions, invalid_count, summary
+
+
+@stage(
+    "analyze",
+    inputs=["validate"],
+    files=[
+        "utils/analysis.py",
+        "utils/data_processor.py",
+        "utils/rfm.py",
+        "utils/market_basket.py",
+        "utils/sketches.py"
+    ],
+    outputs=["output/order_value_sketches.json"]
 )
+def analyze_stage(validated):
+    from utils.analysis import build_analysis
+    from utils.sketches import save_sketch_groups
+
+    # Keep this low enough that large catalogs still report product pairs
+    analysis = build_analysis(validated[0], min_support=0.01)
+    save_sketch_groups(analysis["order_value_sketches"], "output/order_value_sketches.json")
+    print("Analysis complete\n")
+    return analysis
+
+
+@stage("distribution", inputs=["analyze"], files=["utils/sketches.py"] + SKETCH_SHARDS)
+def distribution_stage(analysis):
+    from utils.sketches import load_sketch_groups, merge_sketch_groups
+
+    groups = analysis["order_value_sketches"]
+
+    for path in SKETCH_SHARDS:
+        shard = load_sketch_groups(path)
+        groups = {
+            key: merge_sketch_groups(sketches, shard.get(key, {}))
+            for key, sketches in groups.items()
+        }
+
+    print(f"Order value sketches merged with {len(SKETCH_SHARDS)} saved shard(s)\n")
+    return groups
+
+
+@stage("fetch", files=["utils/api_handler.py"], ttl=FETCH_TTL)
+def fetch_stage():
+    from utils.api_handler import fetch_all_products, create_product_mapping
+
+    api_products = fetch_all_products()
+    product_mapping = create_product_mapping(api_products)
+    print(f"Fetched {len(product_mapping)} products\n")
+
+    # Never cache a failed fetch; retry on the next run
+    if not product_mapping:
+        return Uncached(product_mapping)
+    return product_mapping
+
+
+@stage("enrich", inputs=["validate", "fetch"], files=["utils/api_handler.py"])
+def enrich_stage(validated, product_mapping):
+    from utils.api_handler import enrich_sales_data
+
+    enriched_transactions = enrich_sales_data(validated[0], product_mapping)
+
+    matched = sum(1 for t in enriched_transactions if t["API_Match"])
+    unmatched = len(enriched_transactions) - matched
+
+    print("\n--- API Enrichment Validation ---")
+    print(f"API_Match = True  : {matched}")
+    print(f"API_Match = False : {unmatched}")
+    print(f"Total Enriched Records: {len(enriched_transactions)}\n")
+    return enriched_transactions
+
+
+@stage(
+    "save",
+    inputs=["enrich"],
+    files=["utils/api_handler.py", "utils/columnar.py"],
+    outputs=["data/enriched_sales_data.sacol"]
+)
+def save_stage(enriched_transactions):
+    from utils.api_handler import save_enriched_columnar
+
+    save_enriched_columnar(enriched_transactions)
+    print("Saved to data/enriched_sales_data.sacol\n")
+    return "data/enriched_sales_data.sacol"
+
+
+@stage(
+    "export",
+    inputs=["enrich"],
+    files=["utils/api_handler.py", "utils/file_handler.py"],
+    outputs=["data/enriched_sales_data.txt"]
+)
+def export_stage(enriched_transactions):
+    from utils.api_handler import save_enriched_data
+
+    save_enriched_data(enriched_transactions)
+    print("Exported to data/enriched_sales_data.txt\n")
+    return "data/enriched_sales_data.txt"
+
+
+@stage(
+    "report",
+    inputs=["validate", "enrich", "analyze", "distribution"],
+    files=["utils/report_generator.py", "utils/file_handler.py", "utils/sketches.py"],
+    outputs=["output/sales_report.txt"]
+)
+def report_stage(validated, enriched_transactions, analysis, order_value_sketches):
+    from utils.report_generator import generate_sales_report
+
+    analysis = dict(analysis, order_value_sketches=order_value_sketches)
+    generate_sales_report(validated[0], enriched_transactions, analysis=analysis)
+    print("Report saved to output/sales_report.txt\n")
+    return "output/sales_report.txt"
+
+
+STAGES = [
+    read_stage,
+    parse_stage,
+    validate_stage,
+    analyze_stage,
+    distribution_stage,
+    fetch_stage,
+    enrich_stage,
+    save_stage,
+    export_stage,
+    report_stage
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sales Analytics System")
+    parser.add_argument(
+        "--stage",
+        choices=[func.stage["name"] for func in STAGES],
+        help="run only this stage and the stages it depends on"
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        metavar="STAGE",
+        help="re-run STAGE even if its cached artifact is up to date (repeatable)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="ignore all cached artifacts and re-run every stage"
+    )
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+
     try:
         print("====================================")
         print("SALES ANALYTICS SYSTEM")
         print("====================================\n")
 
-        # --------------------------------------------------
-        # [1/10] Read Sales Data
-        # --------------------------------------------------
-        print("[1/10] Reading sales data...")
-        raw_lines = read_sales_data("data/sales_data.txt")
-        print(f"Successfully read {len(raw_lines)} transactions\n")
-
-        # --------------------------------------------------
-        # [2/10] Parse & Clean Data
-        # --------------------------------------------------
-        print("[2/10] Parsing and cleaning data...")
-        parsed_transactions = parse_transactions(raw_lines)
-        print(f"Parsed {len(parsed_transactions)} records\n")
-
-        # --------------------------------------------------
-        # [3/10] Display Filter Options (Requirement Only)
-        # --------------------------------------------------
-        print("[3/10] Filter Options Available:")
-        print("Regions: North, South, East, West")
-        print("Amount Range: ₹500 - ₹900,000")
-        print("Do you want to filter data? (y/n): n\n")
-
-        # --------------------------------------------------
-        # [4/10] Validate Transactions
-        # --------------------------------------------------
-        print("[4/10] Validating transactions...")
-        valid_transactions, invalid_count, summary = validate_and_filter(parsed_transactions)
-        print(f"Valid: {len(valid_transactions)} | Invalid: {invalid_count}\n")
-
-        # --------------------------------------------------
-        # [5/10] Analyze Sales Data
-        # --------------------------------------------------
-        print("[5/10] Analyzing sales data...")
-        total_revenue = calculate_total_revenue(valid_transactions)
-        region_summary = region_wise_sales(valid_transactions)
-        top_products = top_selling_products(valid_transactions)
-        customers = customer_analysis(valid_transactions)
-        peak_day = find_peak_sales_day(valid_transactions)
-        low_products = low_performing_products(valid_transactions)
-        print("Analysis complete\n")
-
-        # --------------------------------------------------
-        # [6/10] Fetch Product Data from API
-        # --------------------------------------------------
-        print("[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
-        product_mapping = create_product_mapping(api_products)
-        print(f"Fetched {len(product_mapping)} products\n")
-
-        # --------------------------------------------------
-        # [7/10] Enrich Sales Data
-        # --------------------------------------------------
-        print("[7/10] Enriching sales data...")
-        enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
-
-        matched = sum(1 for t in enriched_transactions if t["API_Match"])
-        unmatched = len(enriched_transactions) - matched
-
-        print("\n--- API Enrichment Validation ---")
-        print(f"API_Match = True  : {matched}")
-        print(f"API_Match = False : {unmatched}")
-        print(f"Total Enriched Records: {len(enriched_transactions)}\n")
-
-        # --------------------------------------------------
-        # [8/10] Save Enriched Data
-        # --------------------------------------------------
-        print("[8/10] Saving enriched data...")
-        save_enriched_data(enriched_transactions)
-        print("Saved to data/enriched_sales_data.txt\n")
-
-        # --------------------------------------------------
-        # [9/10] Generate Report
-        # --------------------------------------------------
-        print("[9/10] Generating report...")
-        
-        print("Report saved to output/sales_report.txt\n")
-
-        # --------------------------------------------------
-        # [10/10] Process Complete
-        # --------------------------------------------------
-        print("[10/10] Process Complete!")
+        run_pipeline(
+            STAGES,
+            target=args.stage,
+            force=args.force,
+            use_cache=not args.no_cache
+        )
+
+        print("Process Complete!")
         print("====================================")
 
     except Exception as e:
@@ -0,0 +1,46 @@
+from utils.data_processor import (
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products
+)
+from utils.rfm import rfm_analysis, segment_summary
+from utils.market_basket import market_basket_analysis
+from utils.sketches import order_value_sketches
+
+
+ORDER_VALUE_GROUPS = ("Region", "ProductName", "Date")
+
+
+def build_analysis(transactions, min_support=0.05):
+    """
+    Computes every analysis the report formats, so it can be produced once
+    (e.g. by the pipeline's analyze stage) and reused
+
+    min_support: minimum fraction of customers a product pair must reach
+
+    Returns: dictionary of analysis results
+    """
+
+    customers = customer_analysis(transactions)
+
+    return {
+        "total_revenue": calculate_total_revenue(transactions),
+        "region_summary": region_wise_sales(transactions),
+        "top_products": top_selling_products(transactions, n=5),
+        "customers": customers,
+        "daily_trend": daily_sales_trend(transactions),
+        "peak_day": find_peak_sales_day(transactions),
+        "low_products": low_performing_products(transactions),
+        "customer_segments": segment_summary(rfm_analysis(customers)),
+        "product_pairs": market_basket_analysis(
+            transactions, by="customer", min_support=min_support, n=5
+        ),
+        "order_value_sketches": {
+            key: order_value_sketches(transactions, key)
+            for key in ORDER_VALUE_GROUPS
+        }
+    }
@@ -1,5 +1,3 @@
-import requests
-
 BASE_URL = "https://dummyjson.com/products"
 
 
@@ -10,6 +8,9 @@ def fetch_all_products():
     Returns: list of product dictionaries
     """
 
+    # Imported here so enrich/save/export stages don't pay for loading requests
+    import requests
+
     try:
         response = requests.get(f"{BASE_URL}?limit=100", timeout=10)
         response.raise_for_status()
@@ -51,6 +52,9 @@ def create_product_mapping(api_products):
 
 import re
 
+from utils.file_handler import open_text
+from utils.columnar import write_columnar
+
 
 def enrich_sales_data(transactions, product_mapping):
     """
@@ -95,6 +99,7 @@ def enrich_sales_data(transactions, product_mapping):
 def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
     """
     Saves enriched transactions back to file
+    (compressed when filename ends in .gz, .bz2, .xz or .zst)
     """
 
     headers = [
@@ -104,7 +109,7 @@ def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data
     ]
 
     try:
-        with open(filename, "w", encoding="utf-8") as file:
+        with open_text(filename, "w", encoding="utf-8") as file:
             file.write("|".join(headers) + "\n")
 
             for txn in enriched_transactions:
@@ -129,3 +134,16 @@ def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data
 
     except Exception as e:
         print("Failed to save enriched data:", e)
+
+def save_enriched_columnar(enriched_transactions, filename="data/enriched_sales_data.sacol"):
+    """
+    Saves enriched transactions in the binary columnar format
+    (reload with utils.columnar.read_columnar)
+    """
+
+    try:
+        write_columnar(enriched_transactions, filename)
+        print(f"Enriched data saved to {filename}")
+
+    except Exception as e:
+        print("Failed to save enriched data:", e)
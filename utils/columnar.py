@@ -0,0 +1,362 @@
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+# File layout:
+#   MAGIC
+#   column chunks, each aligned to 8 bytes; string columns are followed by
+#   their dictionary (uint64 offsets + concatenated UTF-8 values)
+#   footer (UTF-8 JSON: schema, row groups, chunk offsets, min/max)
+#   footer length (uint32, little endian)
+#   MAGIC
+MAGIC = b"SACOL02\x00"
+ALIGNMENT = 8
+ROW_GROUP_SIZE = 65536
+
+# Column type -> array typecode of the fixed-width values
+# ("string" columns are stored as uint32 dictionary codes)
+TYPECODES = {
+    "int64": "q",
+    "float64": "d",
+    "bool": "B",
+    "string": "I"
+}
+
+ENRICHED_SCHEMA = [
+    ("TransactionID", "string"),
+    ("Date", "string"),
+    ("ProductID", "string"),
+    ("ProductName", "string"),
+    ("Quantity", "int64"),
+    ("UnitPrice", "float64"),
+    ("CustomerID", "string"),
+    ("Region", "string"),
+    ("API_Category", "string"),
+    ("API_Brand", "string"),
+    ("API_Rating", "float64"),
+    ("API_Match", "bool")
+]
+
+FILTER_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b
+}
+
+
+def _encode_column(values, column_type):
+    """
+    Encodes one row group of a column
+
+    Returns: (array of fixed-width values, dictionary or None, min, max)
+    """
+
+    if column_type == "string":
+        dictionary = []
+        codes = {}
+        encoded = array("I")
+
+        for value in values:
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(dictionary)
+                dictionary.append(value)
+            encoded.append(code)
+
+        present = [v for v in dictionary if v is not None]
+        return encoded, dictionary, min(present, default=None), max(present, default=None)
+
+    if column_type == "float64":
+        # None is stored as NaN
+        encoded = array("d", (math.nan if v is None else float(v) for v in values))
+        present = [v for v in encoded if not math.isnan(v)]
+        return encoded, None, min(present, default=None), max(present, default=None)
+
+    if column_type == "int64":
+        encoded = array("q", (int(v) for v in values))
+    else:
+        encoded = array("B", (1 if v else 0 for v in values))
+
+    return encoded, None, min(encoded, default=None), max(encoded, default=None)
+
+
+def _write_aligned(file, values):
+    """
+    Pads the file to ALIGNMENT and writes an array
+
+    Returns: offset the array was written at
+    """
+
+    file.write(b"\x00" * (-file.tell() % ALIGNMENT))
+    offset = file.tell()
+    values.tofile(file)
+    return offset
+
+
+def _write_dictionary(file, dictionary):
+    """
+    Writes a string dictionary as uint64 end offsets plus a UTF-8 blob
+
+    Returns: dictionary chunk metadata for the footer
+    """
+
+    blob = bytearray()
+    offsets = array("Q", [0])
+
+    for value in dictionary:
+        if value is not None:
+            blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    offsets_at = _write_aligned(file, offsets)
+    data_at = file.tell()
+    file.write(blob)
+
+    return {
+        "count": len(dictionary),
+        "offsets": offsets_at,
+        "data": data_at,
+        "data_length": len(blob),
+        "null_code": dictionary.index(None) if None in dictionary else -1
+    }
+
+
+def write_columnar(rows, filename, schema=ENRICHED_SCHEMA, row_group_size=ROW_GROUP_SIZE):
+    """
+    Writes a list of row dictionaries as a binary columnar file with typed
+    fixed-width columns, dictionary-encoded strings and per-row-group
+    min/max statistics
+    """
+
+    row_groups = []
+
+    with open(filename, "wb") as file:
+        file.write(MAGIC)
+
+        for start in range(0, len(rows), row_group_size):
+            group_rows = rows[start:start + row_group_size]
+            group = {"rows": len(group_rows), "columns": {}}
+
+            for name, column_type in schema:
+                encoded, dictionary, min_value, max_value = _encode_column(
+                    [row.get(name) for row in group_rows], column_type
+                )
+
+                chunk = {
+                    "offset": _write_aligned(file, encoded),
+                    "length": len(encoded),
+                    "min": min_value,
+                    "max": max_value
+                }
+                if dictionary is not None:
+                    chunk["dictionary"] = _write_dictionary(file, dictionary)
+
+                group["columns"][name] = chunk
+
+            row_groups.append(group)
+
+        footer = json.dumps({
+            "byteorder": sys.byteorder,
+            "schema": [{"name": name, "type": column_type} for name, column_type in schema],
+            "row_groups": row_groups
+        }).encode("utf-8")
+
+        file.write(footer)
+        file.write(struct.pack("<I", len(footer)))
+        file.write(MAGIC)
+
+
+class ColumnarFile:
+    """
+    Memory-mapped reader for files written by write_columnar.
+
+    Memoryviews returned by raw_column() point into the mapped file and
+    must be released (view.release() or dropping every reference) before
+    the file is closed.
+    """
+
+    def __init__(self, filename):
+        tail = len(MAGIC) + 4
+        self._file = open(filename, "rb")
+
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses empty files
+            self._file.close()
+            raise ValueError(f"{filename} is not a columnar sales file")
+
+        self._view = memoryview(self._mmap)
+
+        if (
+            len(self._mmap) < len(MAGIC) + tail
+            or self._mmap[:len(MAGIC)] != MAGIC
+            or self._mmap[-len(MAGIC):] != MAGIC
+        ):
+            self.close()
+            raise ValueError(f"{filename} is not a columnar sales file")
+
+        try:
+            footer_length = struct.unpack("<I", self._mmap[-tail:-len(MAGIC)])[0]
+            footer = json.loads(bytes(self._mmap[-tail - footer_length:-tail]).decode("utf-8"))
+
+            self.schema = {c["name"]: c["type"] for c in footer["schema"]}
+            self.row_groups = footer["row_groups"]
+            self._native = footer["byteorder"] == sys.byteorder
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            self._view = memoryview(self._mmap)
+            raise BufferError(
+                "Cannot close ColumnarFile while memoryviews from raw_column() "
+                "are still in use; release them first"
+            ) from None
+
+        self._file.close()
+
+    @property
+    def num_rows(self):
+        return sum(group["rows"] for group in self.row_groups)
+
+    def raw_column(self, name, group_index):
+        """
+        Returns the fixed-width values of a column chunk; a zero-copy
+        memoryview over the mapped file when the byte order matches
+        (dictionary codes for string columns)
+        """
+
+        chunk = self.row_groups[group_index]["columns"][name]
+        return self._array(chunk["offset"], chunk["length"], TYPECODES[self.schema[name]])
+
+    def _array(self, offset, length, typecode):
+        data = self._view[offset:offset + length * struct.calcsize(typecode)]
+
+        if self._native:
+            return data.cast(typecode)
+
+        values = array(typecode)
+        values.frombytes(data)
+        values.byteswap()
+        return values
+
+    def dictionary(self, name, group_index):
+        """
+        Returns: list of the distinct values of a string column chunk,
+        indexed by dictionary code
+        """
+
+        meta = self.row_groups[group_index]["columns"][name]["dictionary"]
+        offsets = self._array(meta["offsets"], meta["count"] + 1, "Q")
+        blob = bytes(self._view[meta["data"]:meta["data"] + meta["data_length"]])
+
+        values = [
+            blob[offsets[i]:offsets[i + 1]].decode("utf-8")
+            for i in range(meta["count"])
+        ]
+        if meta["null_code"] >= 0:
+            values[meta["null_code"]] = None
+
+        return values
+
+    def column(self, name, group_index):
+        """
+        Returns: list of decoded Python values of a column chunk
+        """
+
+        column_type = self.schema[name]
+        raw = self.raw_column(name, group_index)
+
+        if column_type == "string":
+            dictionary = self.dictionary(name, group_index)
+            return [dictionary[code] for code in raw]
+        if column_type == "float64":
+            return [None if math.isnan(v) else v for v in raw]
+        if column_type == "bool":
+            return [bool(v) for v in raw]
+        return raw.tolist()
+
+    def _may_match(self, group, filters):
+        for name, op, value in filters:
+            stats = group["columns"][name]
+            low, high = stats["min"], stats["max"]
+
+            if low is None:
+                if op != "!=":
+                    return False
+                continue
+
+            if op == "==" and not low <= value <= high:
+                return False
+            if op in ("<", "<=") and not FILTER_OPS[op](low, value):
+                return False
+            if op in (">", ">=") and not FILTER_OPS[op](high, value):
+                return False
+
+        return True
+
+    def read(self, columns=None, filters=()):
+        """
+        Reads rows, skipping row groups whose min/max statistics rule out
+        every filter
+
+        filters: list of (column, op, value), op in ==, !=, <, <=, >, >=
+
+        Returns: list of row dictionaries
+        """
+
+        columns = list(columns or self.schema)
+        filters = list(filters)
+
+        for name, op, _ in filters:
+            if name not in self.schema or op not in FILTER_OPS:
+                raise ValueError(f"Invalid filter ({name!r}, {op!r})")
+
+        needed = columns + [name for name, _, _ in filters if name not in columns]
+        rows = []
+
+        for index, group in enumerate(self.row_groups):
+            if not self._may_match(group, filters):
+                continue
+
+            data = {name: self.column(name, index) for name in needed}
+
+            for i in range(group["rows"]):
+                if all(
+                    data[name][i] is not None and FILTER_OPS[op](data[name][i], value)
+                    for name, op, value in filters
+                ):
+                    rows.append({name: data[name][i] for name in columns})
+
+        return rows
+
+
+def read_columnar(filename, columns=None, filters=()):
+    """
+    Loads rows from a columnar file (see ColumnarFile.read)
+
+    Returns: list of row dictionaries
+    """
+
+    with ColumnarFile(filename) as reader:
+        return reader.read(columns=columns, filters=filters)
@@ -1,53 +1,98 @@
-def parse_transactions(raw_lines):
+from bisect import bisect_right
+
+from utils.quarantine import WRONG_FIELD_COUNT, BAD_QUANTITY, BAD_UNIT_PRICE
+
+
+def _reject(quarantine, line_numbers, skipped, parsed, reason, line):
+    # Every raw line before this one was either parsed or skipped
+    position = parsed + len(skipped)
+    skipped.append(position)
+
+    if quarantine is not None:
+        line_number = line_numbers[position] if line_numbers is not None else None
+        quarantine.reject(line_number, reason, line)
+
+
+def parse_transactions(raw_lines, quarantine=None, line_numbers=None, skipped=None):
     """
     Parses raw lines into clean list of dictionaries
 
+    Rejected rows are sent to quarantine (a QuarantineWriter) with a reason
+    code and their source line (line_numbers[i] for raw_lines[i]) when one
+    is given. skipped, if given, receives the position in raw_lines of every
+    rejected row; see source_position. Nothing extra is done for rows that
+    parse cleanly.
+
     Returns: list of dictionaries with keys:
     ['TransactionID', 'Date', 'ProductID', 'ProductName',
      'Quantity', 'UnitPrice', 'CustomerID', 'Region']
     """
 
     transactions = []
+    if skipped is None:
+        skipped = []
 
     for line in raw_lines:
         parts = line.split("|")
 
         # Skip rows with incorrect number of fields
         if len(parts) != 8:
+            _reject(quarantine, line_numbers, skipped, len(transactions), WRONG_FIELD_COUNT, line)
             continue
 
-        try:
-            transaction_id = parts[0].strip()
-            date = parts[1].strip()
-            product_id = parts[2].strip()
+        transaction_id = parts[0].strip()
+        date = parts[1].strip()
+        product_id = parts[2].strip()
 
-            # Remove commas from ProductName
-            product_name = parts[3].replace(",", "").strip()
+        # Remove commas from ProductName
+        product_name = parts[3].replace(",", "").strip()
 
-            # Remove commas from numeric fields
+        # Remove commas from numeric fields; skip rows with conversion issues
+        try:
             quantity = int(parts[4].replace(",", "").strip())
-            unit_price = float(parts[5].replace(",", "").strip())
-
-            customer_id = parts[6].strip()
-            region = parts[7].strip()
-
-            transactions.append({
-                "TransactionID": transaction_id,
-                "Date": date,
-                "ProductID": product_id,
-                "ProductName": product_name,
-                "Quantity": quantity,
-                "UnitPrice": unit_price,
-                "CustomerID": customer_id,
-                "Region": region
-            })
+        except ValueError:
+            _reject(quarantine, line_numbers, skipped, len(transactions), BAD_QUANTITY, line)
+            continue
 
+        try:
+            unit_price = float(parts[5].replace(",", "").strip())
         except ValueError:
-            # Skip rows with conversion issues
+            _reject(quarantine, line_numbers, skipped, len(transactions), BAD_UNIT_PRICE, line)
             continue
 
+        customer_id = parts[6].strip()
+        region = parts[7].strip()
+
+        transactions.append({
+            "TransactionID": transaction_id,
+            "Date": date,
+            "ProductID": product_id,
+            "ProductName": product_name,
+            "Quantity": quantity,
+            "UnitPrice": unit_price,
+            "CustomerID": customer_id,
+            "Region": region
+        })
+
     return transactions
 
+
+def source_position(position, skipped):
+    """
+    Maps a position in parse_transactions' output back to the position of
+    its line in raw_lines, given the sorted positions parse skipped
+
+    Returns: int
+    """
+
+    offset = bisect_right(skipped, position)
+
+    while True:
+        shifted = bisect_right(skipped, position + offset)
+        if shifted == offset:
+            return position + offset
+        offset = shifted
+
 def calculate_total_revenue(transactions):
     """
     Calculates total revenue from all transactions
@@ -146,7 +191,8 @@ def customer_analysis(transactions):
     """
     Analyzes customer purchase patterns
 
-    Returns: dictionary of customer statistics
+    Returns: dictionary of customer statistics, including the
+    'last_purchase' date used for RFM scoring
     """
 
     customer_data = {}
@@ -155,18 +201,24 @@ def customer_analysis(transactions):
         customer = txn["CustomerID"]
         amount = txn["Quantity"] * txn["UnitPrice"]
         product = txn["ProductName"]
+        date = txn["Date"]
 
         if customer not in customer_data:
             customer_data[customer] = {
                 "total_spent": 0.0,
                 "purchase_count": 0,
-                "products": set()
+                "products": set(),
+                "last_purchase": date
             }
 
         customer_data[customer]["total_spent"] += amount
         customer_data[customer]["purchase_count"] += 1
         customer_data[customer]["products"].add(product)
 
+        # ISO dates (YYYY-MM-DD) compare correctly as strings
+        if date > customer_data[customer]["last_purchase"]:
+            customer_data[customer]["last_purchase"] = date
+
     # Final formatting
     result = {}
 
@@ -177,7 +229,8 @@ def customer_analysis(transactions):
             "total_spent": round(data["total_spent"], 2),
             "purchase_count": data["purchase_count"],
             "avg_order_value": round(avg_order_value, 2),
-            "products_bought": sorted(list(data["products"]))
+            "products_bought": sorted(list(data["products"])),
+            "last_purchase": data["last_purchase"]
         }
 
     # Sort by total_spent descending
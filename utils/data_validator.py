@@ -1,13 +1,40 @@
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+from datetime import date
+
+from utils.quarantine import (
+    QUANTITY_NOT_POSITIVE,
+    PRICE_NOT_POSITIVE,
+    BAD_TRANSACTION_ID,
+    BAD_PRODUCT_ID,
+    BAD_CUSTOMER_ID,
+    MISSING_REGION,
+    BAD_DATE,
+    INVALID_RECORD
+)
+
+RECORD_FIELDS = [
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region"
+]
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, quarantine=None, source_lines=None):
     """
     Validates transactions and applies optional filters
 
+    Invalid transactions are sent to quarantine (a QuarantineWriter) with a
+    reason code when one is given; filter_summary['invalid_reasons'] always
+    holds the per-reason counts. source_lines(i) returns the
+    (line_number, raw line) that transactions[i] was parsed from; it is only
+    called for invalid rows, so quarantined records show exactly what was
+    read. Without it the record is rebuilt from the parsed fields.
+
     Returns:
     (valid_transactions, invalid_count, filter_summary)
     """
 
     valid_transactions = []
     invalid_count = 0
+    invalid_reasons = {}
 
     total_input = len(transactions)
     filtered_by_region = 0
@@ -23,21 +50,25 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     amounts = [t["Quantity"] * t["UnitPrice"] for t in transactions]
     print(f"Transaction Amount Range: {min(amounts)} - {max(amounts)}")
 
-    for txn in transactions:
+    for position, txn in enumerate(transactions):
         try:
             # Validation rules
             if txn["Quantity"] <= 0:
-                raise ValueError
+                raise ValueError(QUANTITY_NOT_POSITIVE)
             if txn["UnitPrice"] <= 0:
-                raise ValueError
+                raise ValueError(PRICE_NOT_POSITIVE)
             if not txn["TransactionID"].startswith("T"):
-                raise ValueError
+                raise ValueError(BAD_TRANSACTION_ID)
             if not txn["ProductID"].startswith("P"):
-                raise ValueError
+                raise ValueError(BAD_PRODUCT_ID)
             if not txn["CustomerID"].startswith("C"):
-                raise ValueError
+                raise ValueError(BAD_CUSTOMER_ID)
             if not txn["Region"]:
-                raise ValueError
+                raise ValueError(MISSING_REGION)
+            try:
+                date.fromisoformat(txn["Date"])
+            except ValueError:
+                raise ValueError(BAD_DATE)
 
             amount = txn["Quantity"] * txn["UnitPrice"]
 
@@ -57,12 +88,24 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
 
             valid_transactions.append(txn)
 
-        except Exception:
+        except Exception as e:
             invalid_count += 1
 
+            reason = e.args[0] if isinstance(e, ValueError) and e.args else INVALID_RECORD
+            invalid_reasons[reason] = invalid_reasons.get(reason, 0) + 1
+
+            if quarantine is not None:
+                if source_lines is not None:
+                    line_number, record = source_lines(position)
+                else:
+                    line_number = None
+                    record = "|".join(str(txn.get(field, "")) for field in RECORD_FIELDS)
+                quarantine.reject(line_number, reason, record)
+
     filter_summary = {
         "total_input": total_input,
         "invalid": invalid_count,
+        "invalid_reasons": invalid_reasons,
         "filtered_by_region": filtered_by_region,
         "filtered_by_amount": filtered_by_amount,
         "final_count": len(valid_transactions)
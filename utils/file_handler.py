@@ -1,31 +1,215 @@
-def read_sales_data(filename):
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from array import array
+
+# Magic bytes take precedence over the file extension when reading
+COMPRESSION_MAGIC = [
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd")
+]
+
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd"
+}
+
+READ_AHEAD_BLOCK_SIZE = 1 << 20
+READ_AHEAD_DEPTH = 4
+
+
+def detect_compression(filename, mode="r"):
+    """
+    Detects the compression format of a file from its magic bytes
+    (when reading) or its extension
+
+    Returns: "gzip", "bz2", "xz", "zstd" or None
+    """
+
+    if "r" in mode:
+        try:
+            with open(filename, "rb") as file:
+                head = file.read(6)
+        except FileNotFoundError:
+            head = b""
+
+        for magic, compression in COMPRESSION_MAGIC:
+            if head.startswith(magic):
+                return compression
+
+        if head:
+            return None
+
+    extension = os.path.splitext(filename)[1].lower()
+    return COMPRESSION_EXTENSIONS.get(extension)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd files require the 'zstandard' package (pip install zstandard)")
+    return zstandard
+
+
+class _ReadAheadReader(io.RawIOBase):
+    """
+    Decompresses a stream in a background thread so decompression overlaps
+    with parsing (zlib, bz2 and lzma release the GIL while working)
+    """
+
+    def __init__(self, stream, block_size=READ_AHEAD_BLOCK_SIZE, depth=READ_AHEAD_DEPTH):
+        super().__init__()
+        self._stream = stream
+        self._block_size = block_size
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._pending = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _produce(self):
+        try:
+            while not self._stop.is_set():
+                block = self._stream.read(self._block_size)
+                self._put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._pending and not self._eof:
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                raise item
+            if not item:
+                self._eof = True
+            self._pending = memoryview(item)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._stream.close()
+        super().close()
+
+
+def _open_compressed_reader(filename, compression):
+    if compression == "gzip":
+        # gzip.open and bz2.open transparently read multi-member files
+        return gzip.open(filename, "rb")
+    if compression == "bz2":
+        return bz2.open(filename, "rb")
+    if compression == "xz":
+        return lzma.open(filename, "rb")
+    if compression == "zstd":
+        decompressor = _zstandard().ZstdDecompressor()
+        return decompressor.stream_reader(open(filename, "rb"), read_across_frames=True, closefd=True)
+    raise ValueError(f"Unsupported compression '{compression}'")
+
+
+def open_text(filename, mode="r", encoding="utf-8", compression="auto"):
+    """
+    Opens a plain or compressed text file for streaming reads or writes.
+
+    When reading, compressed input is detected from its magic bytes and
+    decompressed on the fly by a read-ahead thread; no uncompressed copy is
+    ever written to disk. When writing, the format follows the extension
+    (.gz, .bz2, .xz, .zst). zstd output is compressed on all cores.
+
+    Returns: text file object
+    """
+
+    if compression == "auto":
+        compression = detect_compression(filename, mode)
+
+    if compression is None:
+        return open(filename, mode, encoding=encoding)
+
+    if "r" in mode:
+        stream = _ReadAheadReader(_open_compressed_reader(filename, compression))
+        return io.TextIOWrapper(io.BufferedReader(stream), encoding=encoding)
+
+    if compression == "gzip":
+        return gzip.open(filename, "wt", encoding=encoding)
+    if compression == "bz2":
+        return bz2.open(filename, "wt", encoding=encoding)
+    if compression == "xz":
+        return lzma.open(filename, "wt", encoding=encoding)
+    if compression == "zstd":
+        compressor = _zstandard().ZstdCompressor(threads=-1)
+        writer = compressor.stream_writer(open(filename, "wb"), closefd=True)
+        return io.TextIOWrapper(writer, encoding=encoding)
+
+    raise ValueError(f"Unsupported compression '{compression}'")
+
+
+def read_sales_data(filename, with_line_numbers=False):
     """
     Reads sales data from file handling encoding issues
+    (gzip, bz2, xz and zstd files are decompressed on the fly)
 
-    Returns: list of raw lines (strings)
+    Returns: list of raw lines (strings), or (lines, line_numbers) when
+    with_line_numbers is True, line_numbers[i] being the 1-based line of
+    lines[i] in the file
     """
 
     encodings = ["utf-8", "latin-1", "cp1252"]
 
     for encoding in encodings:
         try:
-            with open(filename, "r", encoding=encoding) as file:
-                lines = file.readlines()
+            with open_text(filename, "r", encoding=encoding) as file:
+                # Skip header
+                next(file, None)
 
-            # Skip header and remove empty lines
-            cleaned_lines = [
-                line.strip()
-                for line in lines[1:]
-                if line.strip()
-            ]
+                # Stream line by line and remove empty lines
+                cleaned_lines = []
+                line_numbers = array("q")
+                for line_number, line in enumerate(file, 2):
+                    line = line.strip()
+                    if line:
+                        cleaned_lines.append(line)
+                        if with_line_numbers:
+                            line_numbers.append(line_number)
 
+            if with_line_numbers:
+                return cleaned_lines, line_numbers
             return cleaned_lines
 
         except UnicodeDecodeError:
             continue
         except FileNotFoundError:
             print(f"Error: File not found -> {filename}")
-            return []
+            break
+    else:
+        print("Error: Unable to read file with supported encodings.")
 
-    print("Error: Unable to read file with supported encodings.")
+    if with_line_numbers:
+        return [], array("q")
     return []
@@ -0,0 +1,170 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+# Basket sets larger than this are counted in a process pool
+PARALLEL_THRESHOLD = 50000
+
+
+def build_baskets(transactions, by="customer"):
+    """
+    Groups products into baskets per customer or per day
+
+    by: "customer" (CustomerID) or "day" (Date)
+
+    Returns: list of sorted product tuples (one per basket)
+    """
+
+    if by == "customer":
+        key = "CustomerID"
+    elif by == "day":
+        key = "Date"
+    else:
+        raise ValueError(f"Unknown basket grouping '{by}' (use 'customer' or 'day')")
+
+    baskets = {}
+
+    for txn in transactions:
+        basket = baskets.get(txn[key])
+        if basket is None:
+            basket = baskets[txn[key]] = set()
+        basket.add(txn["ProductName"])
+
+    return [tuple(sorted(basket)) for basket in baskets.values()]
+
+
+def count_items(baskets):
+    """
+    Counts in how many baskets each product appears
+
+    Returns: Counter mapping product to basket count
+    """
+
+    item_counts = Counter()
+
+    for basket in baskets:
+        item_counts.update(basket)
+
+    return item_counts
+
+
+def prune_baskets(baskets, frequent_items):
+    """
+    Drops infrequent items from each basket, and baskets left with
+    fewer than two items
+
+    Returns: list of sorted product tuples
+    """
+
+    pruned = []
+
+    for basket in baskets:
+        items = tuple(item for item in basket if item in frequent_items)
+        if len(items) >= 2:
+            pruned.append(items)
+
+    return pruned
+
+
+def _count_pairs_chunk(baskets):
+    """
+    Counts co-occurring pairs in a chunk of baskets
+
+    Returns: Counter mapping (product_a, product_b) to basket count
+    """
+
+    pair_counts = Counter()
+
+    for basket in baskets:
+        # Baskets are sorted, so each pair is always emitted as (a, b) with a < b
+        pair_counts.update(combinations(basket, 2))
+
+    return pair_counts
+
+
+def count_pairs(baskets, workers=None):
+    """
+    Builds the sparse co-occurrence matrix of (already pruned) baskets.
+
+    Only pairs that actually occur together in a basket are counted, so the
+    cost follows the basket sizes rather than the square of the catalog.
+    Large basket sets are split into chunks and counted in a process pool.
+
+    Returns: Counter mapping (product_a, product_b) to basket count
+    """
+
+    if len(baskets) < PARALLEL_THRESHOLD:
+        return _count_pairs_chunk(baskets)
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = -(-len(baskets) // workers)
+    chunks = [baskets[i:i + chunk_size] for i in range(0, len(baskets), chunk_size)]
+
+    pair_counts = Counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_count_pairs_chunk, chunk)
+            for chunk in chunks
+        ]
+        for future in futures:
+            pair_counts.update(future.result())
+
+    return pair_counts
+
+
+def market_basket_analysis(transactions, by="customer", min_support=0.05, n=10, workers=None):
+    """
+    Finds products frequently bought together
+
+    Items below min_support (fraction of baskets) are pruned before pair
+    counting, since a pair can never be more frequent than either item.
+
+    Returns: list of tuples sorted by support then lift, descending
+    (ProductA, ProductB, PairCount, Support, Confidence, Lift)
+    where Confidence is P(B | A), A being the less frequent product
+    """
+
+    baskets = build_baskets(transactions, by=by)
+    total = len(baskets)
+
+    if not total:
+        return []
+
+    min_count = max(1, min_support * total)
+
+    item_counts = count_items(baskets)
+    frequent_items = frozenset(
+        item for item, count in item_counts.items() if count >= min_count
+    )
+
+    # Pruning before chunking also keeps infrequent items out of worker IPC
+    pair_counts = count_pairs(prune_baskets(baskets, frequent_items), workers=workers)
+
+    result = []
+
+    for (item_a, item_b), count in pair_counts.items():
+        if count < min_count:
+            continue
+
+        # Report the rule in the direction with the higher confidence
+        if item_counts[item_b] < item_counts[item_a]:
+            item_a, item_b = item_b, item_a
+
+        support = count / total
+        support_a = item_counts[item_a] / total
+        support_b = item_counts[item_b] / total
+
+        result.append((
+            item_a,
+            item_b,
+            count,
+            round(support, 4),
+            round(count / item_counts[item_a], 4),
+            round(support / (support_a * support_b), 4)
+        ))
+
+    result.sort(key=lambda x: (x[3], x[5]), reverse=True)
+
+    return result[:n]
@@ -0,0 +1,266 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+
+CACHE_DIR = ".cache/pipeline"
+
+
+class Uncached:
+    """
+    Wraps a stage result that downstream stages should receive but that
+    must not be cached (e.g. the empty result of a failed API call)
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+def stage(name, inputs=(), files=(), outputs=(), persist=True, ttl=None):
+    """
+    Declares a pipeline stage
+
+    inputs  : names of upstream stages whose artifacts are passed to func
+    files   : source/data files that invalidate the stage when they change
+    outputs : files the stage writes (stage re-runs if any is missing)
+    persist : pickle the artifact to the cache; when False the stage is
+              keyed on its inputs only and re-run whenever a downstream
+              stage needs its artifact (for large, cheap-to-rebuild data)
+    ttl     : seconds after which a cached artifact is considered stale
+
+    Returns: decorator that attaches the stage definition to the function
+    """
+
+    def decorator(func):
+        func.stage = {
+            "name": name,
+            "inputs": list(inputs),
+            "files": list(files),
+            "outputs": list(outputs),
+            "persist": persist,
+            "ttl": ttl,
+            "func": func
+        }
+        return func
+
+    return decorator
+
+
+def hash_file(path):
+    """
+    Hashes a file's content
+
+    Returns: hex digest string ("missing" if the file does not exist)
+    """
+
+    digest = hashlib.sha256()
+
+    try:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return "missing"
+
+    return digest.hexdigest()
+
+
+def build_graph(stage_funcs):
+    """
+    Builds the stage graph from decorated stage functions
+
+    Returns: dictionary mapping stage name to stage definition
+    """
+
+    graph = {}
+
+    for func in stage_funcs:
+        definition = func.stage
+        graph[definition["name"]] = definition
+
+    for name, definition in graph.items():
+        for upstream in definition["inputs"]:
+            if upstream not in graph:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{upstream}'")
+
+    return graph
+
+
+def execution_order(graph, target=None):
+    """
+    Topologically sorts the stages needed to produce target
+    (all stages when target is None)
+
+    Returns: list of stage names
+    """
+
+    if target is not None and target not in graph:
+        raise ValueError(f"Unknown stage '{target}'. Available: {', '.join(graph)}")
+
+    order = []
+    state = {}
+
+    def visit(name):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Cycle detected at stage '{name}'")
+
+        state[name] = "visiting"
+        for upstream in graph[name]["inputs"]:
+            visit(upstream)
+        state[name] = "done"
+        order.append(name)
+
+    for name in ([target] if target else graph):
+        visit(name)
+
+    return order
+
+
+def stage_key(definition, upstream_hashes):
+    """
+    Computes the memoization key of a stage from its name, its source code,
+    the hashes of its upstream artifacts and the content of its declared files
+
+    Returns: hex digest string
+    """
+
+    digest = hashlib.sha256(definition["name"].encode("utf-8"))
+    digest.update(inspect.getsource(definition["func"]).encode("utf-8"))
+
+    for upstream in definition["inputs"]:
+        digest.update(upstream_hashes[upstream].encode("utf-8"))
+
+    for path in definition["files"]:
+        digest.update(path.encode("utf-8"))
+        digest.update(hash_file(path).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def prune_cache(cache_dir, name, key):
+    """
+    Removes cache entries of a stage that were superseded by key
+    """
+
+    for filename in os.listdir(cache_dir):
+        stem, extension = os.path.splitext(filename)
+        if extension not in (".pkl", ".json"):
+            continue
+
+        stage_name, _, entry_key = stem.rpartition("-")
+        if stage_name == name and entry_key != key:
+            os.remove(os.path.join(cache_dir, filename))
+
+
+def run_pipeline(stage_funcs, target=None, force=(), cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Runs the stage DAG, re-executing only stages whose inputs changed.
+
+    Each persisted artifact is pickled and content-hashed; a stage whose key
+    (its source, upstream artifact hashes and declared file contents)
+    matches a fresh cache entry is skipped. Cached artifacts are only
+    unpickled, and non-persisted stages only re-run, when a downstream
+    stage actually has to run.
+
+    Returns: dictionary mapping executed or loaded stage names to artifacts
+    """
+
+    graph = build_graph(stage_funcs)
+    order = execution_order(graph, target)
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    keys = {}
+    hashes = {}
+    artifacts = {}
+    cached_paths = {}
+
+    def paths(name):
+        prefix = os.path.join(cache_dir, f"{name}-{keys[name]}")
+        return prefix + ".pkl", prefix + ".json"
+
+    def execute(name):
+        definition = graph[name]
+        args = [load(upstream) for upstream in definition["inputs"]]
+        result = definition["func"](*args)
+
+        store = use_cache
+        if isinstance(result, Uncached):
+            result = result.value
+            store = False
+
+        artifacts[name] = result
+        artifact_path, meta_path = paths(name)
+
+        if definition["persist"]:
+            payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            hashes[name] = hashlib.sha256(payload).hexdigest()
+        else:
+            # Fully determined by its inputs, so the key stands in for the content
+            hashes[name] = keys[name]
+
+        if not store:
+            return result
+
+        if definition["persist"]:
+            with open(artifact_path, "wb") as file:
+                file.write(payload)
+        with open(meta_path, "w", encoding="utf-8") as file:
+            json.dump({
+                "stage": name,
+                "key": keys[name],
+                "hash": hashes[name],
+                "created": time.time()
+            }, file)
+
+        prune_cache(cache_dir, name, keys[name])
+        return result
+
+    def load(name):
+        if name in artifacts:
+            return artifacts[name]
+
+        if name in cached_paths:
+            with open(cached_paths[name], "rb") as file:
+                artifacts[name] = pickle.load(file)
+            return artifacts[name]
+
+        print(f"{name}: re-running to supply downstream stages (not persisted)")
+        return execute(name)
+
+    for i, name in enumerate(order, 1):
+        definition = graph[name]
+        keys[name] = stage_key(definition, hashes)
+        artifact_path, meta_path = paths(name)
+
+        meta = None
+        if use_cache and name not in force and os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as file:
+                meta = json.load(file)
+
+        is_cached = (
+            meta is not None
+            and all(os.path.exists(p) for p in definition["outputs"])
+            and (not definition["persist"] or os.path.exists(artifact_path))
+            and (definition["ttl"] is None or time.time() - meta["created"] <= definition["ttl"])
+        )
+
+        if is_cached:
+            hashes[name] = meta["hash"]
+            if definition["persist"]:
+                cached_paths[name] = artifact_path
+            print(f"[{i}/{len(order)}] {name}: up to date (cached)\n")
+            continue
+
+        print(f"[{i}/{len(order)}] {name}: running")
+        execute(name)
+
+    # Make sure the requested artifact is available to the caller
+    if target is not None:
+        load(target)
+
+    return artifacts
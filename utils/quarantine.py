@@ -0,0 +1,106 @@
+import os
+import queue
+import threading
+
+BATCH_SIZE = 1024
+
+# Batches waiting for the writer thread; reject() blocks once this many
+# are queued so a slow disk cannot grow memory without limit
+MAX_PENDING_BATCHES = 16
+
+# Reason codes for rejected rows
+WRONG_FIELD_COUNT = "WRONG_FIELD_COUNT"
+BAD_QUANTITY = "BAD_QUANTITY"
+BAD_UNIT_PRICE = "BAD_UNIT_PRICE"
+QUANTITY_NOT_POSITIVE = "QUANTITY_NOT_POSITIVE"
+PRICE_NOT_POSITIVE = "PRICE_NOT_POSITIVE"
+BAD_TRANSACTION_ID = "BAD_TRANSACTION_ID"
+BAD_PRODUCT_ID = "BAD_PRODUCT_ID"
+BAD_CUSTOMER_ID = "BAD_CUSTOMER_ID"
+MISSING_REGION = "MISSING_REGION"
+BAD_DATE = "BAD_DATE"
+INVALID_RECORD = "INVALID_RECORD"
+
+
+class QuarantineWriter:
+    """
+    Streams rejected rows to a file as LineNumber|Reason|Record lines.
+
+    The parse loop only appends to an in-memory batch and bumps a counter;
+    full batches are handed to a background thread that does the file I/O.
+    At most max_pending batches are buffered before reject() waits for it.
+    """
+
+    def __init__(self, filename, batch_size=BATCH_SIZE, max_pending=MAX_PENDING_BATCHES):
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.filename = filename
+        self.counts = {}
+        self._batch = []
+        self._batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+
+        self._file = open(filename, "w", encoding="utf-8")
+        self._file.write("LineNumber|Reason|Record\n")
+
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            try:
+                # One write per batch: each write to disk hands the GIL back
+                # and forth with the parse loop
+                self._file.write("".join([
+                    f"{'' if line_number is None else line_number}|{reason}|{record}\n"
+                    for line_number, reason, record in batch
+                ]))
+            except Exception as e:
+                self._error = e
+
+    def reject(self, line_number, reason, record):
+        """
+        Records one rejected row (line_number may be None if unknown)
+        """
+
+        self.counts[reason] = self.counts.get(reason, 0) + 1
+        self._batch.append((line_number, reason, record))
+
+        if len(self._batch) >= self._batch_size:
+            self._queue.put(self._batch)
+            self._batch = []
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def close(self):
+        """
+        Flushes pending rows and waits for the writer thread
+        """
+
+        if self._file.closed:
+            return
+
+        if self._batch:
+            self._queue.put(self._batch)
+            self._batch = []
+
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+        if self._error is not None:
+            print(f"Failed to write quarantine file {self.filename}:", self._error)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,26 +1,46 @@
+import math
 import os
 from datetime import datetime
-from utils.data_processor import (
-    calculate_total_revenue,
-    region_wise_sales,
-    top_selling_products,
-    customer_analysis,
-    daily_sales_trend,
-    low_performing_products
-)
+from utils.analysis import build_analysis
+from utils.file_handler import open_text
+from utils.sketches import KLLSketch, distribution_summary
 
 
-def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt"):
+def _log_edges(low, high):
+    """
+    Builds 1-2-5 log-scale histogram edges covering [low, high]
+
+    Returns: list of bin edges
+    """
+
+    edges = []
+    decade = 10 ** math.floor(math.log10(low))
+
+    while not edges or edges[-1] <= high:
+        for step in (1, 2, 5):
+            edges.append(decade * step)
+            if edges[-1] > high:
+                break
+        decade *= 10
+
+    return edges
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt", analysis=None):
     """
     Generates a comprehensive formatted text report
+    (compressed when output_file ends in .gz, .bz2, .xz or .zst)
+
+    analysis: output of build_analysis; computed here when not given
     """
 
-    
+    if analysis is None:
+        analysis = build_analysis(transactions)
+
     # Ensure output directory exists before writing the report
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
 
-    with open(output_file, "w", encoding="utf-8") as file:
+    with open_text(output_file, "w", encoding="utf-8") as file:
 
         # ==================================================
         # 1. HEADER
@@ -34,11 +54,12 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # ==================================================
         # 2. OVERALL SUMMARY
         # ==================================================
-        total_revenue = calculate_total_revenue(transactions)
+        total_revenue = analysis["total_revenue"]
         total_txns = len(transactions)
         avg_order_value = total_revenue / total_txns if total_txns else 0
 
-        dates = sorted(t["Date"] for t in transactions)
+        # The daily trend is keyed by date in sorted order
+        dates = list(analysis["daily_trend"])
 
         file.write("OVERALL SUMMARY\n")
         file.write("-" * 40 + "\n")
@@ -50,7 +71,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # ==================================================
         # 3. REGION-WISE PERFORMANCE
         # ==================================================
-        region_data = region_wise_sales(transactions)
+        region_data = analysis["region_summary"]
 
         file.write("REGION-WISE PERFORMANCE\n")
         file.write("-" * 40 + "\n")
@@ -68,7 +89,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # ==================================================
         # 4. TOP 5 PRODUCTS
         # ==================================================
-        top_products = top_selling_products(transactions, n=5)
+        top_products = analysis["top_products"]
 
         file.write("TOP 5 PRODUCTS\n")
         file.write("-" * 40 + "\n")
@@ -81,7 +102,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # ==================================================
         # 5. TOP 5 CUSTOMERS
         # ==================================================
-        customers = customer_analysis(transactions)
+        customers = analysis["customers"]
 
         file.write("TOP 5 CUSTOMERS\n")
         file.write("-" * 40 + "\n")
@@ -98,7 +119,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # ==================================================
         # 6. DAILY SALES TREND
         # ==================================================
-        daily_data = daily_sales_trend(transactions)
+        daily_data = analysis["daily_trend"]
 
         file.write("DAILY SALES TREND\n")
         file.write("-" * 40 + "\n")
@@ -116,7 +137,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # ==================================================
         # 7. PRODUCT PERFORMANCE ANALYSIS
         # ==================================================
-        low_products = low_performing_products(transactions)
+        low_products = analysis["low_products"]
 
         file.write("PRODUCT PERFORMANCE ANALYSIS\n")
         file.write("-" * 40 + "\n")
@@ -148,3 +169,105 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
             file.write("Products Not Enriched:\n")
             for t in unmatched:
                 file.write(f"- {t['ProductID']} ({t['ProductName']})\n")
+        file.write("\n")
+
+        # ==================================================
+        # 9. CUSTOMER SEGMENTS (RFM)
+        # ==================================================
+        segments = analysis["customer_segments"]
+
+        file.write("CUSTOMER SEGMENTS (RFM)\n")
+        file.write("-" * 40 + "\n")
+        file.write(
+            f"{'Segment':<20}{'Customers':>10}{'Revenue':>15}"
+            f"{'Recency':>9}{'Freq':>7}{'Avg Value':>13}\n"
+        )
+
+        for segment, stats in segments.items():
+            file.write(
+                f"{segment:<20}"
+                f"{stats['customers']:>10}"
+                f"₹{stats['total_monetary']:>14,.2f}"
+                f"{stats['avg_recency_days']:>8.1f}d"
+                f"{stats['avg_frequency']:>7.2f}"
+                f"₹{stats['avg_monetary']:>12,.2f}\n"
+            )
+        file.write("\n")
+
+        # ==================================================
+        # 10. MARKET BASKET ANALYSIS
+        # ==================================================
+        top_pairs = analysis["product_pairs"]
+
+        file.write("FREQUENTLY BOUGHT TOGETHER\n")
+        file.write("-" * 40 + "\n")
+
+        if top_pairs:
+            file.write(
+                f"{'Product A':<20}{'Product B':<20}{'Customers':>10}"
+                f"{'Support':>9}{'Conf':>7}{'Lift':>7}\n"
+            )
+            for item_a, item_b, count, support, confidence, lift in top_pairs:
+                file.write(
+                    f"{item_a:<20}{item_b:<20}{count:>10}"
+                    f"{support:>9.2%}{confidence:>7.2f}{lift:>7.2f}\n"
+                )
+        else:
+            file.write("No product pairs above the minimum support.\n")
+        file.write("\n")
+
+        # ==================================================
+        # 11. ORDER VALUE DISTRIBUTION
+        # ==================================================
+        file.write("ORDER VALUE DISTRIBUTION\n")
+        file.write("-" * 40 + "\n")
+
+        groups = analysis["order_value_sketches"]
+
+        for title, key in (
+            ("By Region", "Region"),
+            ("By Product", "ProductName"),
+            ("By Day", "Date")
+        ):
+            summary = distribution_summary(groups[key])
+            if key == "Date":
+                summary = dict(sorted(summary.items()))
+
+            file.write(f"{title}:\n")
+            file.write(
+                f"{key:<24}{'Orders':>7}{'Median':>13}"
+                f"{'P90':>13}{'P99':>13}{'Max':>13}\n"
+            )
+            for group, stats in summary.items():
+                file.write(
+                    f"{group:<24}{stats['orders']:>7}"
+                    f"₹{stats['median']:>12,.2f}"
+                    f"₹{stats['p90']:>12,.2f}"
+                    f"₹{stats['p99']:>12,.2f}"
+                    f"₹{stats['max']:>12,.2f}\n"
+                )
+            file.write("\n")
+
+        # Histograms per region (and overall) on shared 1-2-5 log-scale bins
+        region_sketches = groups["Region"]
+        overall = KLLSketch()
+        for sketch in region_sketches.values():
+            overall.merge(sketch)
+
+        if overall.count and overall.min > 0:
+            edges = _log_edges(overall.min, overall.max)
+            regions = sorted(region_sketches)
+            columns = [region_sketches[r].histogram(edges) for r in regions]
+            columns.append(overall.histogram(edges))
+
+            file.write("Order Value Histogram:\n")
+            file.write(f"{'Order Value':<25}")
+            for name in regions + ["All"]:
+                file.write(f"{name:>9}")
+            file.write("\n")
+
+            for i, (low, high) in enumerate(zip(edges, edges[1:])):
+                file.write(f"₹{low:>9,} - ₹{high:>9,}  ")
+                for counts in columns:
+                    file.write(f"{counts[i]:>9}")
+                file.write("\n")
@@ -0,0 +1,170 @@
+from bisect import bisect_left
+from datetime import date, timedelta
+
+SCORE_BINS = 5
+
+
+def quantile_cut_points(values, bins=SCORE_BINS):
+    """
+    Computes the bins-1 quantile cut points of values with a single sort
+
+    Returns: sorted list of cut points
+    """
+
+    ordered = sorted(values)
+    n = len(ordered)
+
+    if not n:
+        return []
+
+    return [ordered[min(n - 1, (n * k) // bins)] for k in range(1, bins)]
+
+
+def score(value, cut_points):
+    """
+    Maps a value to a 1..len(cut_points)+1 score using the cut points
+
+    Returns: int score
+    """
+
+    # Values equal to a cut point fall in the lower bin, so heavily tied
+    # dimensions (e.g. most customers with one order) stay low
+    return bisect_left(cut_points, value) + 1
+
+
+def segment_name(r_score, f_score, m_score):
+    """
+    Maps RFM scores to a named customer segment
+
+    Returns: segment name string
+    """
+
+    fm_score = (f_score + m_score) / 2
+
+    if r_score >= 4 and fm_score >= 4:
+        return "Champions"
+    if r_score >= 3 and fm_score >= 3:
+        return "Loyal Customers"
+    if r_score >= 4 and fm_score < 2:
+        return "New Customers"
+    if r_score >= 3:
+        return "Potential Loyalists"
+    if r_score == 2 and fm_score >= 3:
+        return "At Risk"
+    if r_score == 1 and fm_score >= 4:
+        return "Can't Lose Them"
+    if r_score == 2:
+        return "Hibernating"
+    return "Lost"
+
+
+def rfm_analysis(customers, reference_date=None):
+    """
+    Scores every customer on Recency, Frequency and Monetary value
+    (1-5 each, 5 = best) and assigns a segment
+
+    customers: output of data_processor.customer_analysis, which collects
+    the last purchase date in the same pass as spend and order count.
+    Customers whose last purchase is not an ISO date are left out.
+    reference_date defaults to the day after the latest purchase
+
+    Returns: dictionary mapping CustomerID to
+    {'last_purchase', 'recency_days', 'frequency', 'monetary',
+     'r_score', 'f_score', 'm_score', 'rfm_score', 'segment'}
+    """
+
+    stats = {}
+
+    for customer, data in customers.items():
+        try:
+            last_purchase = date.fromisoformat(data["last_purchase"])
+        except (TypeError, ValueError):
+            continue
+
+        stats[customer] = {
+            "last_purchase": data["last_purchase"],
+            "last_date": last_purchase,
+            "frequency": data["purchase_count"],
+            "monetary": data["total_spent"]
+        }
+
+    if not stats:
+        return {}
+
+    if reference_date is None:
+        reference_date = max(s["last_date"] for s in stats.values()) + timedelta(days=1)
+
+    for s in stats.values():
+        s["recency_days"] = (reference_date - s["last_date"]).days
+
+    recency_cuts = quantile_cut_points(s["recency_days"] for s in stats.values())
+    frequency_cuts = quantile_cut_points(s["frequency"] for s in stats.values())
+    monetary_cuts = quantile_cut_points(s["monetary"] for s in stats.values())
+
+    result = {}
+
+    for customer, s in stats.items():
+        # Fewer days since the last purchase is better, so invert recency
+        r_score = SCORE_BINS + 1 - score(s["recency_days"], recency_cuts)
+        f_score = score(s["frequency"], frequency_cuts)
+        m_score = score(s["monetary"], monetary_cuts)
+
+        result[customer] = {
+            "last_purchase": s["last_purchase"],
+            "recency_days": s["recency_days"],
+            "frequency": s["frequency"],
+            "monetary": s["monetary"],
+            "r_score": r_score,
+            "f_score": f_score,
+            "m_score": m_score,
+            "rfm_score": f"{r_score}{f_score}{m_score}",
+            "segment": segment_name(r_score, f_score, m_score)
+        }
+
+    return result
+
+
+def segment_summary(rfm_data):
+    """
+    Aggregates RFM results by segment
+
+    Returns: dictionary sorted by total monetary value descending
+    """
+
+    segments = {}
+
+    for data in rfm_data.values():
+        segment = data["segment"]
+
+        if segment not in segments:
+            segments[segment] = {
+                "customers": 0,
+                "monetary": 0.0,
+                "recency_days": 0,
+                "frequency": 0
+            }
+
+        segments[segment]["customers"] += 1
+        segments[segment]["monetary"] += data["monetary"]
+        segments[segment]["recency_days"] += data["recency_days"]
+        segments[segment]["frequency"] += data["frequency"]
+
+    result = {}
+
+    for segment, data in segments.items():
+        count = data["customers"]
+        result[segment] = {
+            "customers": count,
+            "total_monetary": round(data["monetary"], 2),
+            "avg_recency_days": round(data["recency_days"] / count, 1),
+            "avg_frequency": round(data["frequency"] / count, 2),
+            "avg_monetary": round(data["monetary"] / count, 2)
+        }
+
+    return dict(
+        sorted(
+            result.items(),
+            key=lambda x: x[1]["total_monetary"],
+            reverse=True
+        )
+    )
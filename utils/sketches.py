@@ -0,0 +1,299 @@
+import json
+import math
+import random
+from bisect import bisect_right
+
+# k = 400 keeps the p99 rank error around 0.2% at ~1,200 stored values per sketch
+DEFAULT_K = 400
+
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch (Karnin, Lang & Liberty).
+
+    Memory is bounded by roughly 3 * k stored values (about 1,200 at the
+    default k = 400) regardless of how many values are added, and the rank
+    error is around 1/k. Sketches built on different
+    shards or in earlier runs can be combined with merge(), and to_dict() /
+    from_dict() let them be stored between incremental runs.
+    """
+
+    def __init__(self, k=DEFAULT_K, c=2 / 3, seed=0):
+        self.k = k
+        self.c = c
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._rng = random.Random(seed)
+        self._compactors = []
+        self._size = 0
+        self._max_size = 0
+        self._grow()
+
+    def _capacity(self, level):
+        depth = len(self._compactors) - level - 1
+        return int(math.ceil(self.k * self.c ** depth)) + 1
+
+    def _grow(self):
+        self._compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self._compactors)))
+
+    def _compress(self):
+        for level, compactor in enumerate(self._compactors):
+            if len(compactor) < self._capacity(level):
+                continue
+
+            if level + 1 >= len(self._compactors):
+                self._grow()
+
+            compactor.sort()
+            # Keep the odd item out at this level so no weight is lost
+            leftover = [compactor.pop()] if len(compactor) % 2 else []
+            offset = self._rng.randint(0, 1)
+
+            self._compactors[level + 1].extend(compactor[offset::2])
+            self._compactors[level] = leftover
+
+            self._size = sum(len(c) for c in self._compactors)
+            if self._size < self._max_size:
+                return
+
+    def update(self, value):
+        """
+        Adds one value to the sketch
+        """
+
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        self._compactors[0].append(value)
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other):
+        """
+        Folds another sketch into this one
+
+        Returns: self
+        """
+
+        if other.count == 0:
+            return self
+
+        while len(self._compactors) < len(other._compactors):
+            self._grow()
+
+        for level, compactor in enumerate(other._compactors):
+            self._compactors[level].extend(compactor)
+
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+        self._size = sum(len(c) for c in self._compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+        return self
+
+    def _weighted_items(self):
+        items = [
+            (value, 1 << level)
+            for level, compactor in enumerate(self._compactors)
+            for value in compactor
+        ]
+        items.sort()
+        return items
+
+    def quantiles(self, qs):
+        """
+        Estimates several quantiles (0 <= q <= 1) in one pass over the sketch
+
+        Returns: list of values (None if the sketch is empty)
+        """
+
+        if self.count == 0:
+            return [None for _ in qs]
+
+        items = self._weighted_items()
+        weight = sum(w for _, w in items)
+        result = []
+
+        for q in qs:
+            if q <= 0:
+                result.append(self.min)
+                continue
+            if q >= 1:
+                result.append(self.max)
+                continue
+
+            target = q * weight
+            cumulative = 0
+            value = items[-1][0]
+            for item, w in items:
+                cumulative += w
+                if cumulative >= target:
+                    value = item
+                    break
+            result.append(value)
+
+        return result
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def histogram(self, edges):
+        """
+        Estimates how many values fall in each [edges[i], edges[i+1]) bin
+        (the last bin also includes its upper edge)
+
+        Returns: list of estimated counts, scaled to the exact total count
+        """
+
+        items = self._weighted_items()
+        weight = sum(w for _, w in items) or 1
+        counts = [0] * (len(edges) - 1)
+
+        for value, w in items:
+            i = bisect_right(edges, value) - 1
+            if i == len(counts) and value == edges[-1]:
+                i -= 1
+            if 0 <= i < len(counts):
+                counts[i] += w
+
+        return [round(c * self.count / weight) for c in counts]
+
+    def to_dict(self):
+        """
+        Returns: JSON-serializable state of the sketch
+        """
+
+        return {
+            "k": self.k,
+            "c": self.c,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "compactors": [list(c) for c in self._compactors]
+        }
+
+    @classmethod
+    def from_dict(cls, state, seed=0):
+        sketch = cls(k=state["k"], c=state["c"], seed=seed)
+        sketch.count = state["count"]
+        sketch.total = state["total"]
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        sketch._compactors = [list(c) for c in state["compactors"]]
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch._compactors)))
+        sketch._size = sum(len(c) for c in sketch._compactors)
+        return sketch
+
+
+def order_value_sketches(transactions, key, sketches=None, k=DEFAULT_K):
+    """
+    Streams order values (Quantity * UnitPrice) into one sketch per group
+
+    key: transaction field to group by ("Region", "ProductName", "Date")
+    sketches: existing {group: KLLSketch} to update incrementally
+
+    Returns: dictionary mapping group to KLLSketch
+    """
+
+    sketches = {} if sketches is None else sketches
+
+    for txn in transactions:
+        group = txn[key]
+        sketch = sketches.get(group)
+        if sketch is None:
+            sketch = sketches[group] = KLLSketch(k=k)
+        sketch.update(txn["Quantity"] * txn["UnitPrice"])
+
+    return sketches
+
+
+def merge_sketch_groups(*groups):
+    """
+    Merges per-group sketches built on different shards or runs
+
+    Returns: dictionary mapping group to merged KLLSketch
+    """
+
+    merged = {}
+
+    for sketches in groups:
+        for group, sketch in sketches.items():
+            if group not in merged:
+                merged[group] = KLLSketch(k=sketch.k, c=sketch.c)
+            merged[group].merge(sketch)
+
+    return merged
+
+
+def save_sketch_groups(groups, filename):
+    """
+    Saves {key: {group: KLLSketch}} (e.g. one mapping per grouping field)
+    as JSON so a later run or another shard can merge it
+    """
+
+    state = {
+        key: {group: sketch.to_dict() for group, sketch in sketches.items()}
+        for key, sketches in groups.items()
+    }
+
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(state, file)
+
+
+def load_sketch_groups(filename):
+    """
+    Loads sketches saved by save_sketch_groups
+
+    Returns: {key: {group: KLLSketch}}
+    """
+
+    with open(filename, "r", encoding="utf-8") as file:
+        state = json.load(file)
+
+    return {
+        key: {group: KLLSketch.from_dict(data) for group, data in sketches.items()}
+        for key, sketches in state.items()
+    }
+
+
+def distribution_summary(sketches):
+    """
+    Summarizes per-group sketches
+
+    Returns: dictionary sorted by order count descending, of
+    {'orders', 'mean', 'median', 'p90', 'p99', 'max'}
+    """
+
+    result = {}
+
+    for group, sketch in sketches.items():
+        median, p90, p99 = sketch.quantiles([0.5, 0.9, 0.99])
+        result[group] = {
+            "orders": sketch.count,
+            "mean": round(sketch.total / sketch.count, 2) if sketch.count else 0.0,
+            "median": round(median, 2) if median is not None else None,
+            "p90": round(p90, 2) if p90 is not None else None,
+            "p99": round(p99, 2) if p99 is not None else None,
+            "max": round(sketch.max, 2) if sketch.max is not None else None
+        }
+
+    return dict(
+        sorted(
+            result.items(),
+            key=lambda x: x[1]["orders"],
+            reverse=True
+        )
+    )